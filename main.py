@@ -1,9 +1,12 @@
 import csv
-from datetime import datetime
+import io
+import time
 import os
 import sys
 import argparse
-import yaml
+import atexit
+from functools import lru_cache, partial
+from itertools import islice
 from tabulate import tabulate
 
 COMMANDS = {
@@ -24,11 +27,39 @@ COMMANDS = {
     }
 }
 
-def show_help():
-    """Display detailed help information about available commands."""
-    print("\nAvailable Commands:")
-    print("-" * 80)
-    
+DEFAULT_HEADERS = ["Amount", "Category", "Account"]
+
+_SEP30 = "-" * 30
+_SUMMARY_TITLE = "\nSummary of your responses:"
+
+_ACTION_MENU = """
+What would you like to do?
+1. Edit values
+2. Save and enter next entry
+3. Save and quit
+4. Cancel this entry
+"""
+
+# Accepted spellings for a yes answer, checked without lowercasing the input
+_YES_ANSWERS = frozenset({'y', 'Y'})
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Every CSV read and write uses this, independent of the locale
+CSV_ENCODING = 'utf-8'
+
+# Flags for the descriptor CsvSession keeps open
+_APPEND_FLAGS = os.O_RDWR | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+
+# Number of files save_to_csv keeps open between calls. Windows can't delete
+# or rename a file that is open, so nothing is kept open there.
+SESSION_POOL_SIZE = 0 if os.name == 'nt' else 8
+_SESSION_POOL = {}
+
+# Number of rows show_entries renders per table before starting a new one
+SHOW_PAGE_SIZE = 10000
+
+def _build_help_text():
     rows = []
     for cmd, info in COMMANDS.items():
         rows.append([
@@ -38,19 +69,31 @@ def show_help():
             info['example']
         ])
     
-    print(tabulate(rows, 
-                  headers=['Command', 'Description', 'Usage', 'Example'],
-                  tablefmt='grid'))
+    table = tabulate(rows,
+                     headers=['Command', 'Description', 'Usage', 'Example'],
+                     tablefmt='grid')
     
-    print("\nOptions:")
-    print("  --categories FILE  Specify a YAML file containing category definitions")
-    print("                    (default: categories.yaml)")
-    print("\nNotes:")
-    print("- If no command is specified, 'write' is assumed")
-    print("- Categories in the YAML file will be used for matching column names")
-    print("- CSV file is required for all commands except 'help'\n")
+    return "\n".join([
+        "\nAvailable Commands:",
+        "-" * 80,
+        table,
+        "\nOptions:",
+        "  --categories FILE  Specify a YAML file containing category definitions",
+        "                    (default: categories.yaml)",
+        "\nNotes:",
+        "- If no command is specified, 'write' is assumed",
+        "- Categories in the YAML file will be used for matching column names",
+        "- CSV file is required for all commands except 'help'\n",
+    ]) + "\n"
 
-def parse_arguments():
+# The help output never changes, so render it once
+HELP_TEXT = _build_help_text()
+
+def show_help():
+    """Display detailed help information about available commands."""
+    sys.stdout.write(HELP_TEXT)
+
+def _build_parser():
     parser = argparse.ArgumentParser(
         description='CSV-based questionnaire with category support.',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -69,8 +112,19 @@ Examples:
     parser.add_argument('--categories', default='categories.yaml',
                        help='YAML file containing category definitions (default: categories.yaml)')
     
+    return parser
+
+# Built once at import rather than on every parse_arguments call
+_PARSER = _build_parser()
+
+def parse_arguments():
+    # Answer the help command without going through argparse
+    if sys.argv[1:2] == ['help']:
+        show_help()
+        sys.exit(0)
+    
     # Parse arguments
-    args = parser.parse_args()
+    args = _PARSER.parse_args()
     
     # Handle help command
     if args.command == 'help':
@@ -84,41 +138,63 @@ Examples:
     
     # Validate CSV file is provided for non-help commands
     if not args.csv_file:
-        parser.error("CSV file is required for {} command".format(args.command))
+        _PARSER.error("CSV file is required for {} command".format(args.command))
     
     return args
 
 def process_yaml_dict(data, prefix=''):
     """Process a YAML dictionary and its nested structure into dot-notation paths."""
     result = []
+    # Walk the nesting with an explicit stack instead of recursing per level
+    stack = [(data, prefix)]
     
-    if isinstance(data, list):
-        for item in data:
-            if isinstance(item, dict):
-                # Process nested dictionary
-                for key, value in item.items():
-                    key_path = f"{prefix}.{key}" if prefix else key
-                    result.append(key_path)
-                    result.extend(process_yaml_dict(value, key_path))
-            else:
-                # Simple list item
-                result.append(f"{prefix}.{item}" if prefix else item)
-    elif isinstance(data, dict):
-        for key, value in data.items():
-            key_path = f"{prefix}.{key}" if prefix else key
-            result.append(key_path)
-            result.extend(process_yaml_dict(value, key_path))
+    while stack:
+        data, prefix = stack.pop()
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict):
+                    # Queue nested dictionary
+                    for key, value in item.items():
+                        key_path = f"{prefix}.{key}" if prefix else key
+                        result.append(key_path)
+                        stack.append((value, key_path))
+                else:
+                    # Simple list item
+                    result.append(f"{prefix}.{item}" if prefix else item)
+        elif isinstance(data, dict):
+            for key, value in data.items():
+                key_path = f"{prefix}.{key}" if prefix else key
+                result.append(key_path)
+                stack.append((value, key_path))
     
     return result
 
 def load_categories(categories_file='categories.yaml'):
     """Load categories from YAML file."""
-    if not os.path.exists(categories_file):
+    try:
+        st = os.stat(categories_file)
+    except FileNotFoundError:
         return {}
     
+    # Parsing is cached per file version; hand out copies of the cached lists
+    result = _parse_categories(os.path.abspath(categories_file), st.st_mtime_ns, st.st_size)
+    return {category: list(items) for category, items in result.items()}
+
+@lru_cache(maxsize=32)
+def _parse_categories(categories_file, mtime_ns, size):
+    """Parse a categories file; mtime_ns and size only key the cache."""
+    # Imported here so runs that never read categories don't load PyYAML
+    import yaml
+    # Prefer the libyaml-backed loader when PyYAML was built with it
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    
     try:
-        with open(categories_file, 'r') as f:
-            data = yaml.safe_load(f)
+        # YAML files are UTF-8 by spec, whatever the locale says
+        with open(categories_file, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=SafeLoader)
             if not isinstance(data, dict):
                 return {}
             
@@ -138,10 +214,10 @@ def load_categories(categories_file='categories.yaml'):
                             processed.extend(process_yaml_dict(value, key))
                 
                 if processed:
-                    result[category] = sorted(list(set(processed)))
+                    result[category] = sorted(set(processed))
             
             return result
-    except yaml.YAMLError:
+    except (FileNotFoundError, yaml.YAMLError):
         return {}
 
 def flatten_categories(category_dict, prefix='', result=None):
@@ -152,6 +228,12 @@ def flatten_categories(category_dict, prefix='', result=None):
     if not category_dict:
         return result
     
+    # A single plain list of names needs no path building
+    if not prefix and not result and len(category_dict) == 1:
+        values = next(iter(category_dict.values()))
+        if isinstance(values, list) and all(type(item) is str for item in values):
+            return sorted(set(values))
+    
     for key, values in category_dict.items():
         if not isinstance(values, list):
             continue
@@ -169,60 +251,92 @@ def flatten_categories(category_dict, prefix='', result=None):
                 # This is a list of subcategories for the previous item
                 if result:
                     parent = result[-1]
-                    result.extend([f"{parent}.{child}" for child in item])
+                    for child in item:
+                        result.append(f"{parent}.{child}")
     
-    return sorted(list(set(result)))  # Remove duplicates and sort
+    return sorted(set(result))  # Remove duplicates and sort
+
+def flatten_category_map(categories):
+    """Flatten every category list, keyed by its header."""
+    return {header: flatten_categories({header: values})
+            for header, values in categories.items()}
+
+def _headers_from(reader):
+    """Get headers from the first row of a CSV reader or return default headers."""
+    headers = next(reader, [])[1:]  # Skip timestamp column
+    return headers if headers else list(DEFAULT_HEADERS)
 
 def get_headers(filename):
     """Get headers from CSV file or return default headers."""
-    default_headers = ["Amount", "Category", "Account"]
-    
     try:
-        with open(filename, 'r', newline='') as csvfile:
-            reader = csv.reader(csvfile)
-            headers = next(reader)[1:]  # Skip timestamp column
-            return headers if headers else default_headers
-    except (FileNotFoundError, StopIteration):
-        return default_headers
-
-def get_user_input(headers, categories):
-    """Get user input for all fields."""
-    answers = []
+        with open(filename, 'r', encoding=CSV_ENCODING, newline='') as csvfile:
+            return _headers_from(csv.reader(csvfile))
+    except FileNotFoundError:
+        return list(DEFAULT_HEADERS)
+
+def ask(prompt):
+    """Read a menu choice straight from stdin, skipping input()'s readline handling."""
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip('\n')
+
+def build_prompts(headers):
+    """Build the free-form question for each header."""
+    return [f"What is your {header.lower()}? " for header in headers]
+
+def _prompt_for(header, prompt, categories, flat_cache):
+    """Get user input for a single field."""
+    if header in categories:
+        print(f"\nSelect {header}:")
+        return get_category_value(header, categories, flat_cache.get(header))
     
-    for header in headers:
-        if header in categories:
-            print(f"\nSelect {header}:")
-            value = get_category_value(header, categories)
-            answers.append(value)
-        else:
-            question = f"What is your {header.lower()}?"
-            answer = input(f"{question} ")
-            answers.append(answer)
+    return input(prompt)
+
+def get_user_input(headers, categories, flat_cache=None, prompts=None):
+    """Get user input for all fields."""
+    if flat_cache is None:
+        flat_cache = {}
+    if prompts is None:
+        prompts = build_prompts(headers)
     
-    return answers
+    return [_prompt_for(header, prompt, categories, flat_cache)
+            for header, prompt in zip(headers, prompts)]
+
+def get_user_input_no_categories(prompts):
+    """Get user input for all fields when no categories are defined."""
+    return [input(prompt) for prompt in prompts]
 
 def print_summary(headers, answers):
-    print("\nSummary of your responses:")
-    print("-" * 30)
-    for header, answer in zip(headers, answers):
-        print(f"{header}: {answer}")
-    print("-" * 30)
+    # Render the whole block first so it goes out in a single write
+    lines = [_SUMMARY_TITLE, _SEP30]
+    lines.extend(f"{header}: {answer}" for header, answer in zip(headers, answers))
+    lines.append(_SEP30)
+    sys.stdout.write("\n".join(lines) + "\n")
 
-def edit_answers(headers, answers, categories):
+def edit_answers(headers, answers, categories, flat_cache=None):
+    if flat_cache is None:
+        flat_cache = {}
+    
+    # Headers don't change while editing, so build the menu once
+    lines = ["\nWhich field would you like to edit?"]
+    lines.extend(f"{i}. {header}" for i, header in enumerate(headers, 1))
+    lines.append("0. Done editing\n")
+    menu = "\n".join(lines)
+    
     while True:
-        print("\nWhich field would you like to edit?")
-        for i, header in enumerate(headers, 1):
-            print(f"{i}. {header}")
-        print("0. Done editing")
+        sys.stdout.write(menu)
         
         try:
-            choice = int(input("\nEnter the number of the field to edit (0 to finish): "))
+            choice = int(ask("\nEnter the number of the field to edit (0 to finish): "))
             if choice == 0:
                 break
             if 1 <= choice <= len(headers):
                 header = headers[choice-1]
                 # Check if this header has predefined categories
-                category_value = get_category_value(header, categories)
+                category_value = get_category_value(header, categories, flat_cache.get(header))
                 if category_value is not None:
                     answers[choice-1] = category_value
                 else:
@@ -236,98 +350,314 @@ def edit_answers(headers, answers, categories):
     
     return answers
 
+def _last_byte(fd, size):
+    """Read the last byte of an open file without moving its position."""
+    if hasattr(os, 'pread'):
+        return os.pread(fd, 1, size - 1)
+    os.lseek(fd, size - 1, os.SEEK_SET)
+    return os.read(fd, 1)
+
+def _plain_csv_line(row):
+    """Join a row without the csv module, or return None if any field needs quoting."""
+    try:
+        line = ",".join(row)
+    except TypeError:  # Non-string fields are left to csv.writer
+        return None
+    # A comma, quote or line break inside a field would need quoting
+    if line.count(",") != len(row) - 1 or '"' in line or '\r' in line or '\n' in line:
+        return None
+    return line + "\n"
+
+class CsvSession:
+    """Read headers from and append rows to a CSV file through a single handle.
+    
+    Headers are taken from the file unless given explicitly.
+    """
+    
+    def __init__(self, filename, headers=None):
+        self.filename = filename
+        self._fd = None
+        self._prepared = False
+        self._size = 0
+        self._ts_second = None
+        self._ts = None
+        # Rows are formatted into this buffer and written out in one call
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf, lineterminator='\n')
+        
+        try:
+            # Existing files are opened right away without creating missing ones
+            self._fd = os.open(filename, _APPEND_FLAGS)
+        except FileNotFoundError:
+            pass
+        
+        if headers is None:
+            headers = self._read_headers()
+        self.headers = headers
+        self._full_headers = ("Timestamp", *headers)
+        # Reused for every row instead of building a new list per save
+        self._row_buf = [None] * len(self._full_headers)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _read_headers(self):
+        if self._fd is None:
+            return list(DEFAULT_HEADERS)
+        # Parse the first record the same way get_headers does, so quoted
+        # line breaks in a header are handled alike
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        with open(self._fd, 'r', encoding=CSV_ENCODING, newline='', closefd=False) as csvfile:
+            return _headers_from(csv.reader(csvfile))
+    
+    def _prepare(self):
+        # A missing file is only created once something is actually saved
+        if self._fd is None:
+            self._fd = os.open(self.filename, _APPEND_FLAGS | os.O_CREAT, 0o666)
+        
+        size = self._size = os.lseek(self._fd, 0, os.SEEK_END)
+        if size == 0:
+            self._writer.writerow(self._full_headers)
+        elif _last_byte(self._fd, size) != b'\n':
+            # If file doesn't end with newline, add it
+            self._buf.write('\n')
+        self._prepared = True
+    
+    def _ensure_prepared(self):
+        # Another writer may have appended to or replaced the file meanwhile
+        if self._prepared and not self.is_current():
+            self.close()
+        if not self._prepared:
+            self._prepare()
+    
+    def write_row(self, answers):
+        self._ensure_prepared()
+        
+        row = self._row_buf
+        row[0] = self._timestamp()
+        row[1:] = answers
+        self._format_row(row)
+        self._flush_buf()
+    
+    def write_rows(self, rows):
+        """Append several rows with a single write."""
+        self._ensure_prepared()
+        
+        # The whole batch shares one timestamp
+        timestamp = self._timestamp()
+        for answers in rows:
+            self._format_row((timestamp, *answers))
+        self._flush_buf()
+    
+    def _format_row(self, row):
+        # Only rows with fields that need quoting go through csv.writer
+        line = _plain_csv_line(row)
+        if line is None:
+            self._writer.writerow(row)
+        else:
+            self._buf.write(line)
+    
+    def _timestamp(self):
+        # Saves within the same second reuse the already formatted string
+        now = int(time.time())
+        if now != self._ts_second:
+            self._ts_second = now
+            self._ts = time.strftime(TIMESTAMP_FORMAT, time.localtime(now))
+        return self._ts
+    
+    def _flush_buf(self):
+        # O_APPEND puts every write at the current end of file
+        data = memoryview(self._buf.getvalue().encode(CSV_ENCODING))
+        self._size += len(data)
+        while data:
+            data = data[os.write(self._fd, data):]
+        self._buf.seek(0)
+        self._buf.truncate()
+    
+    def is_current(self):
+        """Check that the file on disk still ends where this session last wrote."""
+        if self._fd is None or not self._prepared:
+            return False
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            return False
+        return os.path.samestat(st, os.fstat(self._fd)) and st.st_size == self._size
+    
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._prepared = False
+
 def save_to_csv(filename, headers, answers):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    full_headers = ["Timestamp"] + headers
-    row = [timestamp] + answers
-    
-    file_exists = os.path.exists(filename)
-    
-    if file_exists:
-        # Check if file ends with newline
-        with open(filename, 'r') as f:
-            f.seek(0, 2)  # Seek to end of file
-            if f.tell() > 0:  # If file is not empty
-                f.seek(f.tell() - 1)  # Go to last character
-                last_char = f.read(1)
-                if last_char != '\n':
-                    # If file doesn't end with newline, add it
-                    with open(filename, 'a') as f2:
-                        f2.write('\n')
-    
-    # Now append the new data
-    with open(filename, 'a', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        if not file_exists:
-            writer.writerow(full_headers)
-        writer.writerow(row)
+    """Append one entry, or a list of entries, to a CSV file.
+    
+    The file is given by path or as an open text file; an open file must be
+    readable (e.g. opened with 'a+') and is left open so callers can share it
+    across saves. Files given by path also stay open (see SESSION_POOL_SIZE)
+    until close_sessions() is called or the program exits.
+    """
+    # A list of lists (or tuples) is several entries, anything else is one
+    rows = answers if answers and isinstance(answers[0], (list, tuple)) else [answers]
+    
+    if not hasattr(filename, 'write'):
+        save_many_to_csv(filename, headers, rows)
+        return
+    
+    csvfile = filename
+    writer = csv.writer(csvfile, lineterminator='\n')
+    # Check what is actually on disk, including anything the caller buffered
+    csvfile.flush()
+    fd = csvfile.fileno()
+    size = os.fstat(fd).st_size
+    if size == 0:
+        writer.writerow(("Timestamp", *headers))
+    else:
+        if not csvfile.readable():
+            raise ValueError("Open CSV files must be readable, e.g. opened with 'a+'")
+        if _last_byte(fd, size) != b'\n':
+            # If file doesn't end with newline, add it
+            csvfile.write('\n')
+    timestamp = time.strftime(TIMESTAMP_FORMAT)
+    writer.writerows([timestamp, *row] for row in rows)
+    
+    print(f"\nResponses have been saved to {getattr(csvfile, 'name', csvfile)}")
+
+def _pooled_session(filename, headers):
+    """Get an open session for filename, reusing the one from an earlier save."""
+    path = os.path.abspath(filename)
+    # Sessions re-check the file before each write, so reuse is safe as long
+    # as a recreated file gets the headers of this call
+    session = _SESSION_POOL.pop(path, None)
+    if session is not None and tuple(session.headers) != tuple(headers):
+        session.close()
+        session = None
+    if session is None:
+        # Use the absolute path so later reopens ignore working directory changes
+        session = CsvSession(path, headers)
+    
+    _SESSION_POOL[path] = session
+    if len(_SESSION_POOL) > SESSION_POOL_SIZE:
+        # Drop the least recently used session
+        _SESSION_POOL.pop(next(iter(_SESSION_POOL))).close()
+    return session
+
+def close_sessions():
+    """Close the sessions kept open by save_to_csv and save_many_to_csv."""
+    while _SESSION_POOL:
+        _SESSION_POOL.popitem()[1].close()
+
+atexit.register(close_sessions)
+
+def save_many_to_csv(filename, headers, rows):
+    if SESSION_POOL_SIZE:
+        _pooled_session(filename, headers).write_rows(rows)
+    else:
+        with CsvSession(filename, headers) as session:
+            session.write_rows(rows)
     
     print(f"\nResponses have been saved to {filename}")
 
+def _checked_rows(reader, header_count):
+    """Yield rows as tuples, stopping at the first one with the wrong column count."""
+    for row in reader:
+        if len(row) != header_count:
+            raise ValueError("inconsistent number of columns")
+        yield tuple(row)
+
 def show_entries(filename):
-    if not os.path.exists(filename):
+    try:
+        if os.path.getsize(filename) == 0:
+            print("Error: CSV file is empty")
+            return
+    except FileNotFoundError:
         print(f"Error: File {filename} does not exist")
         return
         
     try:
-        with open(filename, 'r', newline='') as csvfile:
-            # First validate CSV format by reading all lines
-            content = csvfile.read()
-            if not content.strip():
-                print("Error: CSV file is empty")
-                return
-                
-            # Try parsing as CSV
+        # Stream rows straight from the file instead of reading it all up front
+        with open(filename, 'r', encoding=CSV_ENCODING, newline='', buffering=1 << 20) as csvfile:
             try:
-                reader = csv.reader(content.splitlines())
-                headers = next(reader)
+                reader = csv.reader(csvfile)
+                headers = next(reader, None)
                 if not headers:
                     print("Error: Invalid CSV format - no headers found")
                     return
                     
-                # Read and validate data
-                data = []
-                header_count = len(headers)
-                for row in reader:
-                    if len(row) != header_count:
-                        print("Error: Invalid CSV format - inconsistent number of columns")
-                        return
-                    data.append(row)
+                # Validate every row before printing anything, so a bad row late
+                # in the file doesn't leave earlier pages on screen
+                rows = _checked_rows(reader, len(headers))
+                data = list(islice(rows, SHOW_PAGE_SIZE))
+                total = len(data) + sum(1 for _ in rows)
                     
-            except (csv.Error, StopIteration) as e:
+            except (csv.Error, ValueError) as e:
                 print(f"Error: Invalid CSV format - {str(e)}")
                 return
             
-            if not data:
+            if not total:
                 print("No entries found in the file.")
                 return
+            
+            title = f"\nEntries from {filename}:"
+            if total > len(data):
+                # Print large files page by page from a second pass to keep memory bounded
+                csvfile.seek(0)
+                reader = csv.reader(csvfile)
+                next(reader)
+                data = []
+                for row in reader:
+                    data.append(row)
+                    if len(data) == SHOW_PAGE_SIZE:
+                        page = tabulate(data, headers=headers, tablefmt='grid')
+                        sys.stdout.write(f"{title}\n{page}\n" if title else page + "\n")
+                        title = ""
+                        data.clear()
                 
-            print(f"\nEntries from {filename}:")
-            print(tabulate(data, headers=headers, tablefmt='grid'))
-            print(f"\nTotal entries: {len(data)}")
+            # Emit the rest of the output in a single write
+            parts = []
+            if title:
+                parts.append(title)
+            if data:
+                parts.append(tabulate(data, headers=headers, tablefmt='grid'))
+            parts.append(f"\nTotal entries: {total}")
+            sys.stdout.write("\n".join(parts) + "\n")
             
     except Exception as e:
         print(f"Error reading file: {str(e)}")
 
-def get_category_value(header, categories):
+def get_category_value(header, categories, flat_categories=None):
     """Get category value with proper path handling."""
     if header not in categories:
         return None
     
-    # Get flattened list of categories
-    flat_categories = flatten_categories({header: categories[header]})
+    # Reuse the pre-flattened list when the caller has one
+    if flat_categories is None:
+        flat_categories = flatten_categories({header: categories[header]})
+    
+    count = len(flat_categories)
+    prompt = f"\nSelect {header} (1-{count}): "
+    # Built once and reprinted as is after invalid input
+    lines = [f"\nAvailable options for {header}:"]
+    lines.extend(f"{i}. {value}" for i, value in enumerate(flat_categories, 1))
+    menu = "\n".join(lines) + "\n"
+    
     while True:
-        print(f"\nAvailable options for {header}:")
-        for i, value in enumerate(flat_categories, 1):
-            print(f"{i}. {value}")
+        sys.stdout.write(menu)
         
-        try:
-            choice = int(input(f"\nSelect {header} (1-{len(flat_categories)}): "))
-            if 1 <= choice <= len(flat_categories):
-                return flat_categories[choice - 1]
-            print("Invalid choice. Please try again.")
-        except ValueError:
+        # Reject non-numeric input up front rather than via int()'s ValueError
+        answer = input(prompt).strip()
+        if not answer.isdecimal():
             print("Please enter a valid number.")
+            continue
+        
+        choice = int(answer)
+        if 1 <= choice <= count:
+            return flat_categories[choice - 1]
+        print("Invalid choice. Please try again.")
 
 def main():
     args = parse_arguments()
@@ -337,41 +667,49 @@ def main():
         return
         
     # Default 'write' command
-    headers = get_headers(args.csv_file)
-    categories = load_categories(args.categories)
-    print("\nCategories loaded:", categories)
-    
-    while True:
-        print(f"\nWelcome to the questionnaire! (saving to {args.csv_file})")
-        print("Please answer the following questions:\n")
-        
-        answers = get_user_input(headers, categories)
-        print_summary(headers, answers)
+    # Keep the CSV open for the whole session; it also supplies the headers
+    with CsvSession(args.csv_file) as session:
+        headers = session.headers
+        categories = load_categories(args.categories)
+        print("\nCategories loaded:", categories)
+        # Flatten each category list once instead of on every prompt
+        flat_cache = flatten_category_map(categories)
+        prompts = build_prompts(headers)
+        # Without categories every field is free-form, so skip the lookups
+        if categories:
+            gather = partial(get_user_input, headers, categories, flat_cache, prompts)
+        else:
+            gather = partial(get_user_input_no_categories, prompts)
         
         while True:
-            print("\nWhat would you like to do?")
-            print("1. Edit values")
-            print("2. Save and enter next entry")
-            print("3. Save and quit")
-            print("4. Cancel this entry")
+            print(f"\nWelcome to the questionnaire! (saving to {args.csv_file})")
+            print("Please answer the following questions:\n")
             
-            choice = input("\nEnter your choice (1-4): ")
+            answers = gather()
+            print_summary(headers, answers)
             
-            if choice == "1":
-                answers = edit_answers(headers, answers, categories)
-            elif choice == "2":
-                save_to_csv(args.csv_file, headers, answers)
-                break
-            elif choice == "3":
-                save_to_csv(args.csv_file, headers, answers)
-                return
-            elif choice == "4":
-                print("\nEntry cancelled. No data was saved.")
-                if input("\nWould you like to enter a new entry? (y/n): ").lower() != 'y':
+            while True:
+                sys.stdout.write(_ACTION_MENU)
+                
+                choice = ask("\nEnter your choice (1-4): ")
+                
+                if choice == "1":
+                    answers = edit_answers(headers, answers, categories, flat_cache)
+                elif choice == "2":
+                    session.write_row(answers)
+                    print(f"\nResponses have been saved to {args.csv_file}")
+                    break
+                elif choice == "3":
+                    session.write_row(answers)
+                    print(f"\nResponses have been saved to {args.csv_file}")
                     return
-                break
-            else:
-                print("Invalid choice. Please try again.")
+                elif choice == "4":
+                    print("\nEntry cancelled. No data was saved.")
+                    if ask("\nWould you like to enter a new entry? (y/n): ") not in _YES_ANSWERS:
+                        return
+                    break
+                else:
+                    print("Invalid choice. Please try again.")
 
 if __name__ == "__main__":
     main()
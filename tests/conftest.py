@@ -0,0 +1,8 @@
+import pytest
+from main import close_sessions
+
+@pytest.fixture(autouse=True)
+def _close_pooled_sessions():
+    """Close files save_to_csv keeps open so no state leaks between tests."""
+    yield
+    close_sessions()
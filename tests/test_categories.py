@@ -3,15 +3,15 @@ import os
 import yaml
 from main import load_categories, get_headers, save_to_csv
 
-@pytest.fixture
-def category_file(tmp_path):
-    """Create a temporary category file for testing."""
+@pytest.fixture(scope='session')
+def category_file(tmp_path_factory):
+    """Create a temporary category file shared by the whole test session."""
     categories = {
         'Category': ['food', 'transport', 'entertainment'],
         'Account': ['savings', 'checking', 'cash']
     }
     
-    category_file = tmp_path / "test_categories.yaml"
+    category_file = tmp_path_factory.mktemp('cats') / "test_categories.yaml"
     with open(category_file, 'w') as f:
         yaml.dump(categories, f)
     
@@ -88,3 +88,18 @@ def test_invalid_category_file():
     finally:
         # Cleanup
         os.remove("invalid.yaml")
+
+def test_load_categories_reloads_changed_file(tmp_path):
+    """Test that cached categories follow changes to the file."""
+    category_file = tmp_path / "cached_categories.yaml"
+    category_file.write_text("Category:\n  - food\n")
+    
+    categories = load_categories(str(category_file))
+    assert categories == {'Category': ['food']}
+    
+    # Changing the returned lists must not leak into later loads
+    categories['Category'].append('changed')
+    assert load_categories(str(category_file)) == {'Category': ['food']}
+    
+    category_file.write_text("Category:\n  - food\n  - transport\n")
+    assert load_categories(str(category_file)) == {'Category': ['food', 'transport']}
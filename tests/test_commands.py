@@ -105,6 +105,21 @@ def test_show_entries_with_data(sample_csv):
     assert "cash" in result
     assert "Total entries: 2" in result
 
+def test_show_entries_paged_invalid_row(sample_csv, monkeypatch):
+    """Test that a bad row after the first page is reported before anything is shown."""
+    monkeypatch.setattr('main.SHOW_PAGE_SIZE', 1)
+    with open(sample_csv, 'a', newline='') as f:
+        f.write("2025-01-16 14:00:00,75\n")
+    
+    output = StringIO()
+    with redirect_stdout(output):
+        show_entries(sample_csv)
+    
+    result = output.getvalue()
+    assert "Error: Invalid CSV format" in result
+    assert "Entries from" not in result
+    assert "food" not in result
+
 def test_show_entries_empty_file(tmp_path):
     """Test showing entries from an empty CSV file."""
     empty_csv = tmp_path / "empty.csv"
@@ -162,3 +177,18 @@ def test_write_and_show_workflow(tmp_path):
     assert "food" in result
     assert "cash" in result
     assert "Total entries: 1" in result
+
+def test_show_entries_paged(sample_csv, monkeypatch):
+    """Test that large files are shown page by page with a correct total."""
+    monkeypatch.setattr('main.SHOW_PAGE_SIZE', 1)
+    
+    output = StringIO()
+    with redirect_stdout(output):
+        show_entries(sample_csv)
+    
+    result = output.getvalue()
+    assert result.count("Entries from") == 1
+    assert result.count("Timestamp") == 2  # One table per page
+    assert "food" in result
+    assert "crypto wallet" in result
+    assert "Total entries: 2" in result
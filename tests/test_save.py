@@ -1,9 +1,10 @@
 import pytest
 import os
 import csv
+import main
 from datetime import datetime
 from unittest.mock import patch
-from main import save_to_csv, get_user_input, get_category_value, flatten_categories, load_categories
+from main import CsvSession, close_sessions, get_headers, save_to_csv, save_many_to_csv, get_user_input, get_user_input_no_categories, get_category_value, flatten_categories, flatten_category_map, load_categories, build_prompts
 
 @pytest.fixture
 def test_csv(tmp_path):
@@ -72,6 +73,288 @@ def test_save_append(test_csv):
         assert rows[1][1:] == entries[0]  # Check first entry
         assert rows[2][1:] == entries[1]  # Check second entry
 
+def test_save_to_open_file_tuple_headers(test_csv):
+    """Test that an open file accepts headers as a tuple, like a path does."""
+    headers = ("Amount", "Category", "Account")
+    
+    with open(test_csv, 'a+', newline='') as f:
+        save_to_csv(f, headers, ["100", "food", "cash"])
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert rows[0] == ["Timestamp", "Amount", "Category", "Account"]
+        assert rows[1][1:] == ["100", "food", "cash"]
+
+def test_save_to_open_file_newline_handling(test_csv):
+    """Test handling of newlines when saving through an open file."""
+    headers = ["Amount", "Category", "Account"]
+    data = ["100", "food", "cash"]
+    
+    # First create file without newline
+    with open(test_csv, 'w') as f:
+        f.write("Timestamp,Amount,Category,Account")  # No newline
+    
+    with open(test_csv, 'a+', newline='') as f:
+        save_to_csv(f, headers, data)
+    
+    with open(test_csv, 'r') as f:
+        content = f.read()
+        lines = content.split('\n')
+        
+        assert lines[0] == "Timestamp,Amount,Category,Account"
+        assert lines[1].endswith("100,food,cash")
+        assert content.endswith('\n'), "File should end with newline"
+    
+    # Write-only handles can't be checked for a missing newline
+    with open(test_csv, 'a', newline='') as f:
+        with pytest.raises(ValueError):
+            save_to_csv(f, headers, data)
+
+def test_save_multiple_entries_at_once(test_csv):
+    """Test passing several entries to a single save_to_csv call."""
+    headers = ["Amount", "Category", "Account"]
+    entries = [
+        ["100", "food", "cash"],
+        ["200", "transport", "checking"]
+    ]
+    
+    save_to_csv(test_csv, headers, entries)
+    save_to_csv(test_csv, headers, entries[1])
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert len(rows) == 4  # Headers + 3 entries
+        assert rows[0] == ["Timestamp"] + headers
+        assert [row[1:] for row in rows[1:]] == entries + [entries[1]]
+
+def test_save_numeric_values(test_csv):
+    """Test saving an entry whose values are not strings."""
+    headers = ["Amount", "Category", "Account"]
+    
+    save_to_csv(test_csv, headers, [100, "food", 2.5])
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert len(rows) == 2
+        assert rows[1][1:] == ["100", "food", "2.5"]
+
+def test_save_to_open_file(test_csv):
+    """Test appending multiple entries through one caller-managed file."""
+    headers = ["Amount", "Category", "Account"]
+    entries = [
+        ["100", "food", "cash"],
+        ["200", "transport", "checking"]
+    ]
+    
+    with open(test_csv, 'a+', newline='') as f:
+        for data in entries:
+            save_to_csv(f, headers, data)
+        assert not f.closed
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert len(rows) == 3  # Headers + 2 entries
+        assert rows[0] == ["Timestamp"] + headers
+        assert rows[1][1:] == entries[0]
+        assert rows[2][1:] == entries[1]
+
+def test_save_many(test_csv):
+    """Test appending multiple entries in one batch."""
+    headers = ["Amount", "Category", "Account"]
+    entries = [
+        ["100", "food", "cash"],
+        ["200", "transport", "checking"]
+    ]
+    
+    save_many_to_csv(test_csv, headers, entries)
+    save_many_to_csv(test_csv, headers, entries[:1])
+    
+    with open(test_csv, 'r', newline='') as f:
+        reader = csv.reader(f)
+        rows = list(reader)
+        
+        assert len(rows) == 4  # Headers + 3 entries
+        assert rows[0] == ["Timestamp"] + headers  # Check headers
+        assert rows[1][1:] == entries[0]
+        assert rows[2][1:] == entries[1]
+        assert rows[3][1:] == entries[0]
+
+def test_save_quoted_values(test_csv):
+    """Test that values needing quotes still round-trip."""
+    headers = ["Amount", "Category", "Note"]
+    entries = [
+        ["100", "food", 'bread, "fresh"'],
+        ["200", "transport", "plain"]
+    ]
+    
+    for data in entries:
+        save_to_csv(test_csv, headers, data)
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert rows[1][1:] == entries[0]
+        assert rows[2][1:] == entries[1]
+
+def test_session_headers(test_csv):
+    """Test that a session takes headers from the file it appends to."""
+    with CsvSession(test_csv) as session:
+        assert session.headers == ["Amount", "Category", "Account"]
+    assert not os.path.exists(test_csv), "Session without saves should not create the file"
+    
+    with open(test_csv, 'w') as f:
+        f.write("Timestamp,Name,Age")  # No newline
+    
+    with CsvSession(test_csv) as session:
+        assert session.headers == ["Name", "Age"]
+        session.write_row(["John Doe", "30"])
+        session.write_row(["Jane Doe", "31"])
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert rows[0] == ["Timestamp", "Name", "Age"]
+        assert rows[1][1:] == ["John Doe", "30"]
+        assert rows[2][1:] == ["Jane Doe", "31"]
+
+@pytest.mark.skipif(os.name == 'nt', reason="open files can't be replaced on Windows")
+def test_session_after_external_change(test_csv):
+    """Test that a long-lived session notices the file changing between saves."""
+    headers = ["Amount", "Category", "Account"]
+    
+    with CsvSession(test_csv, headers) as session:
+        session.write_row(["100", "food", "cash"])
+        with open(test_csv, 'a', newline='') as f:
+            f.write("2025-01-16 13:00:00,50,other,savings")  # No newline
+        session.write_row(["200", "transport", "checking"])
+        
+        with open(test_csv, 'r', newline='') as f:
+            rows = list(csv.reader(f))
+            
+            assert len(rows) == 4
+            assert rows[2][1:] == ["50", "other", "savings"]
+            assert rows[3][1:] == ["200", "transport", "checking"]
+        
+        # Replace the file the way editors that save by rename do
+        replacement = test_csv + ".new"
+        with open(replacement, 'w', newline='') as f:
+            f.write("Timestamp,Amount,Category,Account\n")
+        os.replace(replacement, test_csv)
+        session.write_row(["300", "utilities", "cash"])
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert len(rows) == 2
+        assert rows[1][1:] == ["300", "utilities", "cash"]
+
+def test_save_after_external_change(test_csv):
+    """Test that reused handles notice the file changing between saves."""
+    headers = ["Amount", "Category", "Account"]
+    
+    save_to_csv(test_csv, headers, ["100", "food", "cash"])
+    with open(test_csv, 'a', newline='') as f:
+        f.write("2025-01-16 13:00:00,50,other,savings")  # No newline
+    save_to_csv(test_csv, headers, ["200", "transport", "checking"])
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert len(rows) == 4
+        assert rows[2][1:] == ["50", "other", "savings"]
+        assert rows[3][1:] == ["200", "transport", "checking"]
+    
+    os.remove(test_csv)
+    save_to_csv(test_csv, headers, ["300", "utilities", "cash"])
+    close_sessions()
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert rows[0] == ["Timestamp"] + headers
+        assert rows[1][1:] == ["300", "utilities", "cash"]
+        assert len(rows) == 2
+
+def test_save_recreated_file_with_new_headers(test_csv):
+    """Test that a file recreated between saves gets the new headers."""
+    save_to_csv(test_csv, ["A", "B"], ["1", "2"])
+    os.remove(test_csv)
+    save_to_csv(test_csv, ["X", "Y", "Z"], ["1", "2", "3"])
+    
+    with open(test_csv, 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert rows[0] == ["Timestamp", "X", "Y", "Z"]
+        assert rows[1][1:] == ["1", "2", "3"]
+        assert len(rows) == 2
+
+def test_save_after_changing_directory(tmp_path, monkeypatch):
+    """Test that a reused handle reopens the same file after a directory change."""
+    headers = ["Amount", "Category", "Account"]
+    (tmp_path / "d1").mkdir()
+    (tmp_path / "d2").mkdir()
+    
+    monkeypatch.chdir(tmp_path / "d1")
+    save_to_csv("a.csv", headers, ["100", "food", "cash"])
+    # Replace the file so the next save has to reopen it
+    os.remove("a.csv")
+    
+    monkeypatch.chdir(tmp_path / "d2")
+    save_to_csv(os.path.join("..", "d1", "a.csv"), headers, ["200", "transport", "checking"])
+    
+    assert not os.path.exists(tmp_path / "d2" / "a.csv")
+    with open(tmp_path / "d1" / "a.csv", 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert rows[0] == ["Timestamp"] + headers
+        assert rows[1][1:] == ["200", "transport", "checking"]
+
+def test_session_headers_match_get_headers(test_csv):
+    """Test that a session parses a quoted multi-line header like get_headers."""
+    with open(test_csv, 'w', newline='') as f:
+        f.write('Timestamp,"Multi\nLine",B\n')
+    
+    with CsvSession(test_csv) as session:
+        assert session.headers == ["Multi\nLine", "B"]
+        assert session.headers == get_headers(test_csv)
+
+def test_save_non_ascii_round_trip(test_csv):
+    """Test that non-ASCII headers and values read back unchanged."""
+    headers = ["Määrä", "Väri"]
+    
+    save_to_csv(test_csv, headers, ["10", "ruskea väri"])
+    
+    assert get_headers(test_csv) == headers
+    with CsvSession(test_csv) as session:
+        assert session.headers == headers
+    with open(test_csv, 'rb') as f:
+        assert "ruskea väri".encode('utf-8') in f.read()
+
+def test_session_pool_eviction(tmp_path, monkeypatch):
+    """Test that only the most recently used files are kept open."""
+    monkeypatch.setattr('main.SESSION_POOL_SIZE', 2)
+    headers = ["Amount", "Category", "Account"]
+    paths = [str(tmp_path / f"pool{i}.csv") for i in range(3)]
+    
+    for path in paths:
+        save_to_csv(path, headers, ["100", "food", "cash"])
+    
+    assert list(main._SESSION_POOL) == [os.path.abspath(p) for p in paths[1:]]
+    
+    # The evicted file is reopened on its next save and still appends cleanly
+    save_to_csv(paths[0], headers, ["200", "transport", "checking"])
+    assert os.path.abspath(paths[1]) not in main._SESSION_POOL
+    
+    with open(paths[0], 'r', newline='') as f:
+        rows = list(csv.reader(f))
+        
+        assert len(rows) == 3
+        assert rows[2][1:] == ["200", "transport", "checking"]
+
 def test_save_newline_handling(test_csv):
     """Test handling of newlines when saving."""
     headers = ["Amount", "Category", "Account"]
@@ -140,6 +423,16 @@ def test_get_user_input(test_categories):
         answers = get_user_input(headers, test_categories)
         assert answers == ['John Doe', 'transport.taxi', 'crypto wallet', '50.00']
 
+def test_get_user_input_no_categories():
+    """Test getting user input when no categories are defined."""
+    headers = ["Name", "Amount"]
+    prompts = build_prompts(headers)
+    
+    with patch('builtins.input', side_effect=['John Doe', '50.00']) as mock_input:
+        answers = get_user_input_no_categories(prompts)
+        assert answers == ['John Doe', '50.00']
+        mock_input.assert_any_call("What is your name? ")
+
 def test_save_with_timestamp(test_csv):
     """Test that saved entries include correct timestamp."""
     headers = ["Amount", "Category", "Account"]
@@ -178,6 +471,19 @@ def test_flatten_categories(test_categories):
     
     assert flat_categories == expected_categories  # Order matters since we sort
 
+def test_flatten_category_map(test_categories):
+    """Test that every category list is flattened once up front."""
+    flat_cache = flatten_category_map(test_categories)
+    
+    assert set(flat_cache) == {'Category', 'Account'}
+    assert flat_cache['Category'] == flatten_categories({'Category': test_categories['Category']})
+    assert flat_cache['Account'] == ['cash', 'checking', 'crypto wallet', 'savings']
+    
+    # The pre-flattened list is used as is
+    with patch('builtins.input', return_value='9'):  # 'transport.taxi'
+        result = get_category_value('Category', test_categories, flat_cache['Category'])
+        assert result == 'transport.taxi'
+
 def test_flatten_categories_simple():
     """Test flattening of simple categories without nesting."""
     categories = {